@@ -9,35 +9,40 @@ Based on the original hangman.py implementation, converted to use fastmcp.
 """
 
 import sys
+import threading
+from functools import lru_cache
+from bisect import bisect
 from dataclasses import dataclass, field
-from random import randint
+from random import Random
 from typing import Optional, Dict, Any
-from collections import namedtuple
+from collections import OrderedDict
 
 from fastmcp import FastMCP
 
 # Initialize the MCP server
 mcp = FastMCP("hangman-game-server")
 
-# Type definitions from original hangman.py
-PuzzleLetter = namedtuple('PuzzleLetter', ['character', 'guessed'])
-Puzzle = list[PuzzleLetter]
+# Private random generator so word picks do not share the global random state
+_rng = Random()
 
-# Global game sessions storage
-game_sessions: Dict[str, 'GameState'] = {}
+# Global game sessions storage, least recently used first
+game_sessions: OrderedDict[str, 'GameState'] = OrderedDict()
+_sessions_lock = threading.Lock()
 
+# Oldest sessions are evicted once this many are stored
+MAX_SESSIONS = 10_000
 
-def get_hangman_images() -> tuple[str, ...]:
-    """Return a tuple of hangman ASCII drawings."""
-    return (
-        r"""
+
+# Hangman ASCII drawings, one per stage of the game
+HANGMAN_IMAGES: tuple[str, ...] = (
+    r"""
 
 
     
     
     
 =====""",
-        r"""
+    r"""
     +
     |
     |
@@ -45,7 +50,7 @@ def get_hangman_images() -> tuple[str, ...]:
     |
     |
 =====""",
-        r"""
+    r"""
  +--+
     |
     |
@@ -53,7 +58,7 @@ def get_hangman_images() -> tuple[str, ...]:
     |
     |
 =====""",
-        r"""
+    r"""
  +--+
  |  |
     |
@@ -61,7 +66,7 @@ def get_hangman_images() -> tuple[str, ...]:
     |
     |
 =====""",
-        r"""
+    r"""
  +--+
  |  |
  O  |
@@ -69,7 +74,7 @@ def get_hangman_images() -> tuple[str, ...]:
     |
     |
 =====""",
-        r"""
+    r"""
  +--+
  |  |
  O  |
@@ -77,7 +82,7 @@ def get_hangman_images() -> tuple[str, ...]:
     |
     |
 =====""",
-        r"""
+    r"""
  +--+
  |  |
  O  |
@@ -85,7 +90,7 @@ def get_hangman_images() -> tuple[str, ...]:
     |
     |
 =====""",
-        r"""
+    r"""
  +--+
  |  |
  O  |
@@ -93,7 +98,7 @@ def get_hangman_images() -> tuple[str, ...]:
     |
     |
 =====""",
-        r"""
+    r"""
  +--+
  |  |
  O  |
@@ -101,7 +106,7 @@ def get_hangman_images() -> tuple[str, ...]:
 /   |
     |
 =====""",
-        r"""
+    r"""
  +--+
  |  |
  O  |
@@ -109,107 +114,155 @@ def get_hangman_images() -> tuple[str, ...]:
 / \ |
     |
 =====""",
-    )
+)
+NUM_IMAGES = len(HANGMAN_IMAGES)
+MAX_WRONG = NUM_IMAGES - 1
+_INITIAL_IMAGE = HANGMAN_IMAGES[0]
+_INITIAL_REMAINING = MAX_WRONG
+
+
+def get_hangman_images() -> tuple[str, ...]:
+    """Return a tuple of hangman ASCII drawings."""
+    return HANGMAN_IMAGES
+
+
+_ANIMAL_WORDS_TEXT = """
+Dog Cat Elephant Lion Tiger Giraffe Zebra Bear Koala
+Panda Kangaroo Penguin Dolphin Eagle Owl Fox Wolf Cheetah
+Leopard Jaguar Horse Cow Pig Sheep Goat Chicken Duck Goose
+Swan Octopus Shark Whale Platypus Chimpanzee Gorilla Orangutan
+Baboon Raccoon Squirrel Bat Hedgehog Armadillo Sloth Porcupine
+Anteater Camel Dingo Kangaroo Rat Lemur Meerkat Ocelot Parrot
+Quokka Vulture Wombat Yak Iguana jaguar Kakapo Lemming
+Manatee Nutria Ostrich Pangolin Quail Rhinoceros Serval
+Wallaby Coypu Tapir Pheasant
+"""
+
+# Word lists are parsed and uppercased once at import
+_ANIMAL_WORDS: tuple[str, ...] = tuple(word.upper() for word in _ANIMAL_WORDS_TEXT.split())
+_WORD_LISTS: Dict[str, tuple[str, ...]] = {'animals': _ANIMAL_WORDS}
 
 
 def get_word_list(category: str = 'animals') -> list[str]:
     """Return a list of quiz words."""
-    category = category.lower()
-    
-    animal_words = """
-    Dog Cat Elephant Lion Tiger Giraffe Zebra Bear Koala
-    Panda Kangaroo Penguin Dolphin Eagle Owl Fox Wolf Cheetah
-    Leopard Jaguar Horse Cow Pig Sheep Goat Chicken Duck Goose
-    Swan Octopus Shark Whale Platypus Chimpanzee Gorilla Orangutan
-    Baboon Raccoon Squirrel Bat Hedgehog Armadillo Sloth Porcupine
-    Anteater Camel Dingo Kangaroo Rat Lemur Meerkat Ocelot Parrot
-    Quokka Vulture Wombat Yak Iguana jaguar Kakapo Lemming
-    Manatee Nutria Ostrich Pangolin Quail Rhinoceros Serval
-    Wallaby Coypu Tapir Pheasant
-    """
-    
-    word_list_dict = {'animals': animal_words}
-    
     try:
-        words: str = word_list_dict[category]
-        return [word.upper() for word in words.split()]
+        return list(_WORD_LISTS[category.lower()])
     except KeyError:
         raise ValueError("Invalid category.")
 
 
 def get_secret_word() -> str:
     """Return a random word from multiple options."""
-    try:
-        words: list[str] = get_word_list()
-    except ValueError as exc:
-        raise RuntimeError("Unable to retrieve word list.") from exc
-    
-    secret_word = words[randint(0, len(words) - 1)]
-    if isinstance(secret_word, str) and len(secret_word) > 0:
-        return secret_word
-    raise RuntimeError("Unable to return secret word.")
+    return _rng.choice(_ANIMAL_WORDS)
+
 
+@lru_cache(maxsize=None)
+def _blank_display(length: int) -> str:
+    """Return the display word for a puzzle with no letters revealed."""
+    return ' '.join('_' * length)
 
-@dataclass
+
+@dataclass(slots=True)
 class GameState:
     """Manage state for the hangman game."""
     player_name: str = ''
+    session_id: str = ''
     word: str = ''
     current_guess: str = ''
     guesses: set[str] = field(default_factory=set)
-    remaining_letters: set[str] = field(default_factory=set)
-    puzzle: Puzzle = field(default_factory=list)
+    guesses_sorted: tuple[str, ...] = ()
     image_idx: int = 0
     is_active: bool = False
+    # Distinct letters of the word not yet guessed
+    _unrevealed_count: int = field(init=False, default=0, repr=False)
+    # Indices of each letter in the word; its keys are the word's letter set
+    _letter_positions: Dict[str, list[int]] = field(
+        init=False, default_factory=dict, repr=False
+    )
+    # Display word as bytes, e.g. "K _ K _"
+    _display_buf: bytearray = field(init=False, default_factory=bytearray, repr=False)
+    _display_cache: Optional[str] = field(init=False, default=None, repr=False)
+    _base_response: Dict[str, Any] = field(init=False, default_factory=dict, repr=False)
+    _lock: threading.Lock = field(
+        init=False, default_factory=threading.Lock, repr=False, compare=False
+    )
     
     def initialize_game_state(self) -> None:
         """Post-instantiation initialization."""
-        self.remaining_letters = set(self.word)
-        self.puzzle = [PuzzleLetter(char, False) for char in self.word]
+        self._letter_positions = {}
+        for i, char in enumerate(self.word):
+            self._letter_positions.setdefault(char, []).append(i)
+        self._unrevealed_count = len(self._letter_positions)
+        blank = _blank_display(len(self.word))
+        self._display_buf = bytearray(blank, 'ascii')
+        self._display_cache = blank
+        # Fields that stay constant for the rest of the game
+        self._base_response = {
+            "session_id": self.session_id,
+            "player_name": self.player_name,
+            "word_length": len(self.word),
+        }
         self.is_active = True
     
     def update_state_on_guess(self) -> None:
         """Update the game state based on the current guess."""
-        try:
-            self.remaining_letters.remove(self.current_guess)
-            self.update_puzzle()
-        except KeyError:
+        positions = self._letter_positions.get(self.current_guess)
+        if positions:
+            # Count a letter down only the first time it is revealed
+            if self._display_buf[2 * positions[0]] == ord('_'):
+                self._unrevealed_count -= 1
+                self.update_puzzle()
+        else:
             self.image_idx += 1  # Not in word
     
     def update_puzzle(self) -> None:
         """Update puzzle with correctly guessed letters."""
-        self.puzzle = [
-            PuzzleLetter(char, val or (char == self.current_guess))
-            for char, val in self.puzzle
-        ]
+        code = ord(self.current_guess)
+        for i in self._letter_positions.get(self.current_guess, ()):
+            self._display_buf[2 * i] = code
+        self._display_cache = None
     
     def is_game_won(self) -> bool:
         """Check if the player has won the game."""
-        return len(self.remaining_letters) == 0
+        return self._unrevealed_count == 0
     
     def is_game_lost(self) -> bool:
         """Check if the player has lost the game."""
-        return self.image_idx >= len(get_hangman_images()) - 1
+        return self.image_idx >= MAX_WRONG
     
     def is_game_over(self) -> bool:
         """Check if the game is over (won or lost)."""
-        return self.is_game_won() or self.is_game_lost()
+        return self._unrevealed_count == 0 or self.image_idx >= MAX_WRONG
     
     def get_display_word(self) -> str:
         """Get the current state of the word with guessed letters revealed."""
-        return ' '.join([char if val else '_' for char, val in self.puzzle])
+        if self._display_cache is None:
+            self._display_cache = self._display_buf.decode('ascii')
+        return self._display_cache
     
     def reset_game(self) -> None:
         """Reset the game state for a new game."""
         self.word = ''
         self.current_guess = ''
         self.guesses = set()
-        self.remaining_letters = set()
-        self.puzzle = []
+        self.guesses_sorted = ()
+        self._letter_positions = {}
+        self._unrevealed_count = 0
+        self._display_buf = bytearray()
+        self._display_cache = None
         self.image_idx = 0
         self.is_active = False
 
 
+def _get_session(session_id: str) -> Optional[GameState]:
+    """Look up a game session and mark it as most recently used."""
+    with _sessions_lock:
+        game_state = game_sessions.get(session_id)
+        if game_state is not None:
+            game_sessions.move_to_end(session_id)
+        return game_state
+
+
 def _start_hangman_game(player_name: str, session_id: str = "default") -> Dict[str, Any]:
     """
     Start a new hangman game.
@@ -223,24 +276,34 @@ def _start_hangman_game(player_name: str, session_id: str = "default") -> Dict[s
     """
     try:
         # Create or reset game state
-        if session_id not in game_sessions:
-            game_sessions[session_id] = GameState()
-        
-        game_state = game_sessions[session_id]
-        game_state.reset_game()
-        game_state.player_name = player_name
-        game_state.word = get_secret_word()
-        game_state.initialize_game_state()
+        with _sessions_lock:
+            game_state = game_sessions.get(session_id)
+        if game_state is None:
+            game_state = GameState(session_id=session_id)
         
-        return {
-            "status": "success",
-            "message": f"New game started for {player_name}!",
-            "word_length": len(game_state.word),
-            "display_word": game_state.get_display_word(),
-            "hangman_image": get_hangman_images()[0],
-            "guesses_remaining": len(get_hangman_images()) - 1,
-            "session_id": session_id
-        }
+        with game_state._lock:
+            game_state.reset_game()
+            game_state.player_name = player_name
+            game_state.word = get_secret_word()
+            game_state.initialize_game_state()
+            
+            # Store the session in one step, re-inserting it if end_game
+            # removed it while it was being reset
+            with _sessions_lock:
+                game_sessions[session_id] = game_state
+                game_sessions.move_to_end(session_id)
+                while len(game_sessions) > MAX_SESSIONS:
+                    game_sessions.popitem(last=False)
+            
+            response = game_state._base_response.copy()
+            response.update(
+                status="success",
+                message=f"New game started for {player_name}!",
+                display_word=game_state.get_display_word(),
+                hangman_image=_INITIAL_IMAGE,
+                guesses_remaining=_INITIAL_REMAINING,
+            )
+            return response
     
     except Exception as e:
         return {
@@ -266,80 +329,92 @@ def _make_guess(letter: str, session_id: str = "default") -> Dict[str, Any]:
     Returns:
         Dict containing the result of the guess and current game state
     """
-    if session_id not in game_sessions:
+    game_state = _get_session(session_id)
+    if game_state is None:
         return {
             "status": "error",
             "message": "No active game found. Start a new game first."
         }
     
-    game_state = game_sessions[session_id]
-    
-    if not game_state.is_active:
-        return {
-            "status": "error",
-            "message": "No active game. Start a new game first."
-        }
-    
-    if game_state.is_game_over():
-        return {
-            "status": "error",
-            "message": "Game is already over. Start a new game."
-        }
-    
-    # Validate input
-    letter = letter.upper().strip()
-    if len(letter) != 1 or not letter.isalpha():
-        return {
-            "status": "error",
-            "message": "Please provide exactly one letter."
-        }
-    
-    if letter in game_state.guesses:
-        return {
-            "status": "error",
-            "message": f"You've already guessed '{letter}'. Try a different letter."
-        }
-    
-    # Process the guess
-    game_state.current_guess = letter
-    game_state.guesses.add(letter)
-    is_correct = letter in game_state.word
-    game_state.update_state_on_guess()
-    
-    # Prepare response
-    response = {
-        "status": "success",
-        "letter": letter,
-        "correct": is_correct,
-        "display_word": game_state.get_display_word(),
-        "hangman_image": get_hangman_images()[game_state.image_idx],
-        "guesses_made": sorted(list(game_state.guesses)),
-        "guesses_remaining": len(get_hangman_images()) - 1 - game_state.image_idx
-    }
-    
-    # Check for game over conditions
-    if game_state.is_game_won():
-        response.update({
-            "game_over": True,
-            "won": True,
-            "message": f"Congratulations {game_state.player_name}! You won! The word was '{game_state.word}'."
-        })
-        game_state.is_active = False
-    elif game_state.is_game_lost():
-        response.update({
-            "game_over": True,
-            "won": False,
-            "message": f"Game over {game_state.player_name}! The word was '{game_state.word}'. Better luck next time!"
-        })
-        game_state.is_active = False
-    else:
-        response["game_over"] = False
-        if is_correct:
-            response["message"] = f"Good guess! '{letter}' is in the word."
+    # Hold the session lock so concurrent guesses cannot both pass the checks
+    with game_state._lock:
+        if not game_state.is_active:
+            return {
+                "status": "error",
+                "message": "No active game. Start a new game first."
+            }
+        
+        if game_state.is_game_over():
+            return {
+                "status": "error",
+                "message": "Game is already over. Start a new game."
+            }
+        
+        # Validate input: a single ASCII letter, uppercased by clearing bit 5
+        letter = letter.strip()
+        if len(letter) != 1 or not ('A' <= letter <= 'Z' or 'a' <= letter <= 'z'):
+            return {
+                "status": "error",
+                "message": "Please provide exactly one letter."
+            }
+        letter = chr(ord(letter) & 0xDF)
+        
+        if letter in game_state.guesses:
+            return {
+                "status": "error",
+                "message": f"You've already guessed '{letter}'. Try a different letter."
+            }
+        
+        # Process the guess
+        game_state.current_guess = letter
+        game_state.guesses.add(letter)
+        # Rebuilt once per guess so responses can share it without copying
+        guesses_sorted = game_state.guesses_sorted
+        i = bisect(guesses_sorted, letter)
+        game_state.guesses_sorted = guesses_sorted[:i] + (letter,) + guesses_sorted[i:]
+        is_correct = letter in game_state._letter_positions
+        game_state.update_state_on_guess()
+        
+        # Read the post-guess state once
+        image_idx = game_state.image_idx
+        is_won = game_state.is_game_won()
+        is_lost = not is_won and game_state.is_game_lost()
+        
+        # Prepare response
+        response = game_state._base_response.copy()
+        response.update(
+            status="success",
+            letter=letter,
+            correct=is_correct,
+            display_word=game_state.get_display_word(),
+            hangman_image=HANGMAN_IMAGES[image_idx],
+            guesses_made=game_state.guesses_sorted,
+            guesses_remaining=MAX_WRONG - image_idx,
+        )
+        
+        # Check for game over conditions
+        if is_won:
+            response.update({
+                "game_over": True,
+                "won": True,
+                "message": f"Congratulations {game_state.player_name}! You won! The word was '{game_state.word}'."
+            })
+            game_state.is_active = False
+        elif is_lost:
+            response.update({
+                "game_over": True,
+                "won": False,
+                "message": f"Game over {game_state.player_name}! The word was '{game_state.word}'. Better luck next time!"
+            })
+            game_state.is_active = False
         else:
-            response["message"] = f"Sorry, '{letter}' is not in the word."
-    
-    return response
+            response["game_over"] = False
+            if is_correct:
+                response["message"] = f"Good guess! '{letter}' is in the word."
+            else:
+                response["message"] = f"Sorry, '{letter}' is not in the word."
+        
+        return response
 
 
 @mcp.tool()
@@ -358,32 +433,33 @@ def _get_game_status(session_id: str = "default") -> Dict[str, Any]:
     Returns:
         Dict containing current game state and status
     """
-    if session_id not in game_sessions:
+    game_state = _get_session(session_id)
+    if game_state is None:
         return {
             "status": "no_game",
             "message": "No game session found. Start a new game first."
         }
     
-    game_state = game_sessions[session_id]
-    
-    if not game_state.is_active and not game_state.is_game_over():
-        return {
-            "status": "no_active_game",
-            "message": "No active game. Start a new game first."
-        }
-    
-    return {
-        "status": "active" if game_state.is_active else "finished",
-        "player_name": game_state.player_name,
-        "word_length": len(game_state.word),
-        "display_word": game_state.get_display_word(),
-        "hangman_image": get_hangman_images()[game_state.image_idx],
-        "guesses_made": sorted(list(game_state.guesses)),
-        "guesses_remaining": len(get_hangman_images()) - 1 - game_state.image_idx,
-        "game_over": game_state.is_game_over(),
-        "won": game_state.is_game_won() if game_state.is_game_over() else None,
-        "session_id": session_id
-    }
+    # Read under the session lock so a concurrent start cannot be seen half-reset
+    with game_state._lock:
+        game_over = game_state.is_game_over()
+        if not game_state.is_active and not game_over:
+            return {
+                "status": "no_active_game",
+                "message": "No active game. Start a new game first."
+            }
+        
+        response = game_state._base_response.copy()
+        response.update(
+            status="active" if game_state.is_active else "finished",
+            display_word=game_state.get_display_word(),
+            hangman_image=HANGMAN_IMAGES[game_state.image_idx],
+            guesses_made=game_state.guesses_sorted,
+            guesses_remaining=MAX_WRONG - game_state.image_idx,
+            game_over=game_over,
+            won=game_state.is_game_won() if game_over else None,
+        )
+        return response
 
 
 @mcp.tool()
@@ -400,15 +476,18 @@ def _list_active_sessions() -> Dict[str, Any]:
         Dict containing information about all active sessions
     """
     sessions = []
-    for session_id, game_state in game_sessions.items():
-        sessions.append({
-            "session_id": session_id,
-            "player_name": game_state.player_name,
-            "active": game_state.is_active,
-            "word_length": len(game_state.word) if game_state.word else 0,
-            "guesses_made": len(game_state.guesses),
-            "game_over": game_state.is_game_over()
-        })
+    with _sessions_lock:
+        items = list(game_sessions.items())
+    for session_id, game_state in items:
+        with game_state._lock:
+            sessions.append({
+                "session_id": session_id,
+                "player_name": game_state.player_name,
+                "active": game_state.is_active,
+                "word_length": len(game_state.word) if game_state.word else 0,
+                "guesses_made": len(game_state.guesses),
+                "game_over": game_state.is_game_over()
+            })
     
     return {
         "status": "success",
@@ -433,19 +512,18 @@ def _end_game(session_id: str = "default") -> Dict[str, Any]:
     Returns:
         Dict containing confirmation of game termination
     """
-    if session_id not in game_sessions:
+    # Remove the session in one step so a concurrent end_game cannot race it
+    with _sessions_lock:
+        game_state = game_sessions.pop(session_id, None)
+    if game_state is None:
         return {
             "status": "error",
             "message": "No game session found."
         }
     
-    game_state = game_sessions[session_id]
     word = game_state.word
     player_name = game_state.player_name
     
-    # Clean up the session
-    del game_sessions[session_id]
-    
     return {
         "status": "success",
         "message": f"Game ended for {player_name}. The word was '{word}'. Thanks for playing!"
@@ -460,8 +538,8 @@ def end_game(session_id: str = "default") -> Dict[str, Any]:
 
 if __name__ == "__main__":
     # Check Python version
-    if sys.version_info < (3, 9):
-        print("Hangman MCP Server requires Python 3.9 or later.")
+    if sys.version_info < (3, 10):
+        print("Hangman MCP Server requires Python 3.10 or later.")
         print("Please update your Python version.")
         sys.exit(1)
     
@@ -6,9 +6,11 @@ Tests all server functionality using the actual API response format.
 """
 
 import pytest
+from collections import OrderedDict
 from typing import Dict, Any
 from fastmcp import Client
-from hangman_mcp import mcp
+import hangman_mcp
+from hangman_mcp import mcp, game_sessions
 
 # Configure pytest to use anyio for async tests, only asyncio backend
 pytest_plugins = ["anyio"]
@@ -146,6 +148,42 @@ class TestHangmanMCPServer:
         message_lower = result.data["message"].lower()
         assert "letter" in message_lower or "invalid" in message_lower
     
+    @pytest.mark.anyio
+    async def test_invalid_guess_non_ascii_letter(self, server_client):
+        """Test that a non-ASCII letter is rejected without costing a guess."""
+        await server_client.call_tool(
+            "start_hangman_game",
+            {"player_name": "Ines", "session_id": "accent_session"}
+        )
+        
+        result = await server_client.call_tool(
+            "make_guess",
+            {"letter": "é", "session_id": "accent_session"}
+        )
+        
+        assert result.data["status"] == "error"
+        assert "letter" in result.data["message"].lower()
+        assert game_sessions["accent_session"].image_idx == 0
+        assert game_sessions["accent_session"].guesses == set()
+    
+    @pytest.mark.anyio
+    async def test_guess_is_stripped_and_uppercased(self, server_client):
+        """Test that a padded lowercase guess is stored as an uppercase letter."""
+        await server_client.call_tool(
+            "start_hangman_game",
+            {"player_name": "Jack", "session_id": "upper_session"}
+        )
+        
+        result = await server_client.call_tool(
+            "make_guess",
+            {"letter": " b ", "session_id": "upper_session"}
+        )
+        
+        assert result.data["status"] == "success"
+        assert result.data["letter"] == "B"
+        assert result.data["guesses_made"] == ["B"]
+        assert game_sessions["upper_session"].guesses == {"B"}
+    
     @pytest.mark.anyio
     async def test_get_game_status_after_start(self, server_client):
         """Test getting game status after starting a game."""
@@ -287,6 +325,49 @@ class TestHangmanMCPServer:
         assert "status" in final_status.data
         assert "guesses_made" in final_status.data
 
+    
+    @pytest.mark.anyio
+    async def test_winning_game_reveals_word(self, server_client):
+        """Test that guessing every letter reveals the word and wins."""
+        start_result = await server_client.call_tool(
+            "start_hangman_game",
+            {"player_name": "Winner", "session_id": "win_session"}
+        )
+        word = game_sessions["win_session"].word
+        
+        for letter in sorted(set(word)):
+            result = await server_client.call_tool(
+                "make_guess",
+                {"letter": letter, "session_id": "win_session"}
+            )
+            assert result.data["correct"] is True
+        
+        assert result.data["game_over"] is True
+        assert result.data["won"] is True
+        assert result.data["display_word"] == " ".join(word)
+        assert result.data["guesses_remaining"] == start_result.data["guesses_remaining"]
+    
+    @pytest.mark.anyio
+    async def test_least_recently_used_session_evicted(self, server_client, monkeypatch):
+        """Test that the oldest untouched session is evicted past the cap."""
+        sessions = OrderedDict()
+        monkeypatch.setattr(hangman_mcp, "game_sessions", sessions)
+        monkeypatch.setattr(hangman_mcp, "MAX_SESSIONS", 2)
+        
+        for session_id in ("lru_a", "lru_b"):
+            await server_client.call_tool(
+                "start_hangman_game",
+                {"player_name": "Lru", "session_id": session_id}
+            )
+        
+        # Touch lru_a so lru_b becomes the least recently used
+        await server_client.call_tool("get_game_status", {"session_id": "lru_a"})
+        await server_client.call_tool(
+            "start_hangman_game",
+            {"player_name": "Lru", "session_id": "lru_c"}
+        )
+        
+        assert list(sessions) == ["lru_a", "lru_c"]
 
 if __name__ == "__main__":
     import asyncio